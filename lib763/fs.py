@@ -1,3 +1,4 @@
+import io
 import os
 import shutil
 import zipfile
@@ -5,7 +6,315 @@ import fnmatch
 import chardet
 import glob
 import pickle
-from typing import Union, List, Optional
+import heapq
+import itertools
+import posixpath
+import stat
+import threading
+import time
+import contextlib
+import concurrent.futures
+from urllib.parse import urlsplit
+from typing import (
+    Union,
+    List,
+    Optional,
+    Tuple,
+    Dict,
+    Iterator,
+    Callable,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    import paramiko
+
+_SSH_SCHEME = "ssh://"
+_SSH_KEEPALIVE_SEC = 30
+_SSH_MAX_CHANNELS = 4
+_SSH_CONNECT_TIMEOUT_SEC = 10
+# 走査開始からこの時間以内に更新されたディレクトリは、次回の差分更新で再利用しない
+_USAGE_MTIME_MARGIN_NS = 2 * 10**9
+
+_ssh_lock = threading.Lock()
+_ssh_connect_locks: Dict[Tuple[Optional[str], str, int], threading.Lock] = {}
+_ssh_options: Dict[Tuple[str, int], dict] = {}
+_ssh_clients: Dict[Tuple[Optional[str], str, int], "paramiko.SSHClient"] = {}
+_sftp_pool: Dict[Tuple[Optional[str], str, int], List["paramiko.SFTPClient"]] = {}
+
+
+def is_remote_path(path: str) -> bool:
+    """パスが ssh://[user@]host[:port]/path 形式のリモートパスかを判定します。
+
+    Args:
+        path: 判定するパス
+
+    Returns:
+        リモートパスの場合は True
+    """
+    return isinstance(path, str) and path.startswith(_SSH_SCHEME)
+
+
+def set_ssh_options(
+    host: str, port: int = 22, auto_add_host_key: bool = False, **connect_kwargs
+) -> None:
+    """リモートホストへの接続設定を登録します。
+
+    登録した設定は ssh://host/... 形式のパスを扱う全ての関数で使われます。
+    既に確立済みの接続には影響しないため、必要なら close_ssh_connections を呼んでください。
+
+    Args:
+        host: ホスト名
+        port: ポート番号
+        auto_add_host_key: 未知のホスト鍵を自動で受け入れるかどうか
+        **connect_kwargs: paramiko.SSHClient.connect に渡す引数 (password, key_filename など)
+    """
+    with _ssh_lock:
+        _ssh_options[(host, port)] = dict(
+            connect_kwargs, auto_add_host_key=auto_add_host_key
+        )
+
+
+def close_ssh_connections() -> None:
+    """プールしている全てのSSH/SFTP接続を閉じます。"""
+    with _ssh_lock:
+        for sessions in _sftp_pool.values():
+            for sftp in sessions:
+                sftp.close()
+        for client in _ssh_clients.values():
+            client.close()
+        _sftp_pool.clear()
+        _ssh_clients.clear()
+
+
+def _parse_ssh_url(path: str) -> Tuple[Tuple[Optional[str], str, int], str]:
+    """ssh:// 形式のパスを接続キーとリモートパスに分解します。
+
+    ssh://host/~/dir のようにホームディレクトリからの相対パスも指定できます。
+    ホスト部より後ろはクエリやフラグメントとして解釈せず、そのままリモートパスとして扱います。
+    """
+    netloc, sep, remote_path = path[len(_SSH_SCHEME) :].partition("/")
+    url = urlsplit(_SSH_SCHEME + netloc)
+    if not url.hostname:
+        raise ValueError(f"Invalid ssh path: {path}")
+    remote_path = sep + remote_path or "/"
+    if remote_path == "/~" or remote_path.startswith("/~/"):
+        remote_path = remote_path[3:] or "."
+    return (url.username, url.hostname, url.port or 22), remote_path
+
+
+def _build_ssh_url(key: Tuple[Optional[str], str, int], remote_path: str) -> str:
+    """接続キーとリモートパスから ssh:// 形式のパスを組み立てます。"""
+    username, host, port = key
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port == 22 else f"{host}:{port}"
+    if username:
+        netloc = f"{username}@{netloc}"
+    if not remote_path.startswith("/"):
+        remote_path = "/~/" + remote_path
+    return _SSH_SCHEME + netloc + remote_path
+
+
+def _get_ssh_client(key: Tuple[Optional[str], str, int]) -> "paramiko.SSHClient":
+    """接続キーに対応するSSH接続を取得します。切断されていれば再接続します。"""
+    # ローカルパスしか扱わない場合の import を軽くするため、必要になってから読み込む
+    import paramiko
+
+    username, host, port = key
+    with _ssh_lock:
+        connect_lock = _ssh_connect_locks.setdefault(key, threading.Lock())
+    # 接続処理はホストごとのロックで行い、他ホストへの転送を止めない
+    with connect_lock:
+        with _ssh_lock:
+            client = _ssh_clients.get(key)
+            options = dict(_ssh_options.get((host, port), {}))
+        transport = client.get_transport() if client is not None else None
+        if transport is not None and transport.is_active():
+            return client
+        if client is not None:
+            client.close()
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        if options.pop("auto_add_host_key", False):
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        if username:
+            options["username"] = username
+        options.setdefault("timeout", _SSH_CONNECT_TIMEOUT_SEC)
+        client.connect(host, port=port, **options)
+        client.get_transport().set_keepalive(_SSH_KEEPALIVE_SEC)
+        with _ssh_lock:
+            _ssh_clients[key] = client
+        return client
+
+
+@contextlib.contextmanager
+def _sftp_session(key: Tuple[Optional[str], str, int]) -> Iterator["paramiko.SFTPClient"]:
+    """プールからSFTPチャネルを借り、使用後にプールへ返却します。
+
+    チャネルは同一ホストへのSSH接続上に多重化されるため、
+    並列転送ではチャネルごとに独立して読み書きできます。
+    """
+    sftp = None
+    dead_sessions = []
+    with _ssh_lock:
+        sessions = _sftp_pool.setdefault(key, [])
+        while sessions and sftp is None:
+            candidate = sessions.pop()
+            channel = candidate.get_channel()
+            if not channel.closed and channel.get_transport().is_active():
+                sftp = candidate
+            else:
+                dead_sessions.append(candidate)
+    for dead in dead_sessions:
+        dead.close()
+    if sftp is None:
+        sftp = _get_ssh_client(key).open_sftp()
+    try:
+        yield sftp
+    finally:
+        if sftp.get_channel().closed:
+            sftp.close()
+        else:
+            with _ssh_lock:
+                _sftp_pool.setdefault(key, []).append(sftp)
+
+
+def _listdir_remote(
+    sftp: "paramiko.SFTPClient", path: str
+) -> Tuple[List[str], List[str]]:
+    """リモートディレクトリ直下のディレクトリ名とファイル名を取得します。
+
+    sftp-server は一覧の属性を lstat で返すため、シンボリックリンクはリンク先で分類し、
+    ローカルの os.path.isdir / os.path.isfile と同じ結果にします。
+    リンク切れや通常ファイル以外のエントリは含めません。
+    """
+    dir_names, file_names = [], []
+    for attr in sftp.listdir_attr(path):
+        mode = attr.st_mode
+        if stat.S_ISLNK(mode):
+            try:
+                mode = sftp.stat(posixpath.join(path, attr.filename)).st_mode
+            except FileNotFoundError:
+                continue
+        if stat.S_ISDIR(mode):
+            dir_names.append(attr.filename)
+        elif stat.S_ISREG(mode):
+            file_names.append(attr.filename)
+    return dir_names, file_names
+
+
+def _walk_remote(
+    sftp: "paramiko.SFTPClient", top: str
+) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """os.walk と同様にリモートディレクトリを走査します。
+
+    os.walk(topdown=True) と同様に、yield された dir_names を書き換えると走査対象を絞り込めます。
+    """
+    dir_names, file_names = _listdir_remote(sftp, top)
+    yield top, dir_names, file_names
+    for dir_name in dir_names:
+        yield from _walk_remote(sftp, posixpath.join(top, dir_name))
+
+
+def _makedirs_remote(sftp: "paramiko.SFTPClient", path: str) -> None:
+    """os.makedirs(exist_ok=True) と同様にリモートディレクトリを作成します。"""
+    if path in ("", "/", "."):
+        return
+    try:
+        if stat.S_ISDIR(sftp.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        pass
+    _makedirs_remote(sftp, posixpath.dirname(path.rstrip("/")))
+    sftp.mkdir(path)
+
+
+def _remote_dst_path(sftp: "paramiko.SFTPClient", dst: str, src: str) -> str:
+    """shutil.copy と同様に、コピー先がディレクトリならファイル名を付加します。"""
+    try:
+        if stat.S_ISDIR(sftp.stat(dst).st_mode):
+            return posixpath.join(dst, os.path.basename(src))
+    except FileNotFoundError:
+        pass
+    return dst
+
+
+def _copy_remote_file(load_path: str, save_path: str) -> None:
+    """リモートパスを含むファイルコピーを行います。
+
+    読み込みはプリフェッチ、書き込みはパイプライン化されたSFTP転送を使います。
+    """
+    if is_remote_path(load_path) and is_remote_path(save_path):
+        src_key, src = _parse_ssh_url(load_path)
+        dst_key, dst = _parse_ssh_url(save_path)
+        with _sftp_session(src_key) as src_sftp, _sftp_session(dst_key) as dst_sftp:
+            dst = _remote_dst_path(dst_sftp, dst, src)
+            with src_sftp.open(src, "rb") as f:
+                f.prefetch()
+                dst_sftp.putfo(f, dst)
+    elif is_remote_path(load_path):
+        key, src = _parse_ssh_url(load_path)
+        if os.path.isdir(save_path):
+            save_path = os.path.join(save_path, posixpath.basename(src))
+        with _sftp_session(key) as sftp:
+            sftp.get(src, save_path)
+    else:
+        key, dst = _parse_ssh_url(save_path)
+        with _sftp_session(key) as sftp:
+            sftp.put(load_path, _remote_dst_path(sftp, dst, load_path))
+
+
+def _list_tree(path: str) -> Tuple[List[str], List[str]]:
+    """ディレクトリ以下の相対ディレクトリパスと相対ファイルパスを取得します。"""
+    if is_remote_path(path):
+        key, top = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp:
+            walked = list(_walk_remote(sftp, top))
+        relpath = posixpath.relpath
+    else:
+        top = path
+        # shutil.copytree と同様にシンボリックリンク先のディレクトリも中身をコピーする
+        walked = list(os.walk(path, followlinks=True))
+        relpath = os.path.relpath
+    dirs, files = [], []
+    for dir_path, dir_names, file_names in walked:
+        rel_dir = relpath(dir_path, top).replace("\\", "/")
+        rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        dirs.extend(rel_dir + name for name in dir_names)
+        files.extend(rel_dir + name for name in file_names)
+    return dirs, files
+
+
+def _copy_remote_dir(load_path: str, save_path: str, max_workers: int) -> None:
+    """リモートパスを含むディレクトリコピーを複数チャネルで並列に行います。"""
+    dirs, files = _list_tree(load_path)
+    load_path, save_path = load_path.rstrip("/"), save_path.rstrip("/")
+    if is_remote_path(save_path):
+        key, dst = _parse_ssh_url(save_path)
+        with _sftp_session(key) as sftp:
+            try:
+                sftp.stat(dst)
+                raise FileExistsError(f"File exists: {save_path}")
+            except FileNotFoundError:
+                pass
+            _makedirs_remote(sftp, dst)
+            for rel_dir in dirs:
+                sftp.mkdir(posixpath.join(dst, rel_dir))
+    else:
+        os.makedirs(save_path)
+        for rel_dir in dirs:
+            os.makedirs(os.path.join(save_path, rel_dir))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _copy_remote_file, load_path + "/" + rel, save_path + "/" + rel
+            )
+            for rel in files
+        ]
+        for future in futures:
+            future.result()
 
 
 def save_object_to_file(obj: object, path: str) -> None:
@@ -15,6 +324,12 @@ def save_object_to_file(obj: object, path: str) -> None:
         obj: 保存するオブジェクト
         path: 保存するパス
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp, sftp.open(remote_path, "wb") as f:
+            f.set_pipelined(True)
+            pickle.dump(obj, f)
+        return
     with open(path, "wb") as f:
         pickle.dump(obj, f)
 
@@ -31,6 +346,11 @@ def load_object_from_file(path: str) -> object:
     Raises:
         FileNotFoundError: 指定したパスが存在しない場合
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp, sftp.open(remote_path, "rb") as f:
+            f.prefetch()
+            return pickle.load(f)
     if not os.path.exists(path):
         raise FileNotFoundError(f"No such file: {path}")
     with open(path, "rb") as f:
@@ -46,6 +366,12 @@ def save_str_to_file(sentence: str, path: str, encoding="utf-8") -> None:
         path: 保存するパス
         encoding: エンコーディング
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp, sftp.open(remote_path, "wb") as f:
+            f.set_pipelined(True)
+            f.write(sentence.encode(encoding))
+        return
     with open(path, "w", encoding=encoding) as f:
         f.write(sentence)
 
@@ -61,6 +387,13 @@ def append_str_to_file(sentence: str, path: str, encoding="utf-8") -> None:
     Raises:
         FileNotFoundError: 指定したパスが存在しない場合
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp:
+            sftp.stat(remote_path)
+            with sftp.open(remote_path, "ab") as f:
+                f.write(sentence.encode(encoding))
+        return
     if not os.path.exists(path):
         raise FileNotFoundError(f"No such file: {path}")
     with open(path, "a", encoding=encoding) as f:
@@ -79,6 +412,14 @@ def load_str_from_file(path: str, encoding="utf-8") -> str:
     Raises:
         FileNotFoundError: 指定したパスが存在しない場合
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp, sftp.open(remote_path, "rb") as f:
+            f.prefetch()
+            text = f.read().decode(encoding)
+        # ローカルのテキストモードと同じく \n, \r, \r\n のみを改行として扱う
+        lines = [line.rstrip() for line in io.StringIO(text, newline=None)]
+        return "\n".join(lines)
     if not os.path.exists(path):
         raise FileNotFoundError(f"No such file: {path}")
     with open(path, "r", encoding=encoding) as f:
@@ -94,6 +435,19 @@ def get_all_file_path_in(target_dir: str) -> list:
     Returns:
         対象ディレクトリ内のすべてのファイルのパス
     """
+    if is_remote_path(target_dir):
+        key, top = _parse_ssh_url(target_dir)
+        paths = []
+        with _sftp_session(key) as sftp:
+            for dir_path, dir_names, file_names in _walk_remote(sftp, top):
+                # globと同様に隠しファイル・隠しディレクトリは含めない
+                dir_names[:] = [name for name in dir_names if not name.startswith(".")]
+                paths.extend(
+                    _build_ssh_url(key, posixpath.join(dir_path, name))
+                    for name in file_names
+                    if not name.startswith(".")
+                )
+        return paths
     return [
         path.replace("\\", "/")
         for path in glob.glob(target_dir + "/**/*", recursive=True)
@@ -110,6 +464,12 @@ def get_all_dir_path_in(target_dir: str) -> list:
     Returns:
         対象ディレクトリ内のすべてのサブディレクトリ
     """
+    if is_remote_path(target_dir):
+        return [
+            target_dir.rstrip("/") + "/" + dir_name + "/"
+            for dir_name in get_all_dir_names_in(target_dir)
+            if not dir_name.startswith(".")
+        ]
     return [
         path.replace("\\", "/")
         for path in glob.glob(target_dir + "/*/", recursive=True)
@@ -126,6 +486,10 @@ def get_all_dir_names_in(target_dir: str) -> list:
     Returns:
         対象のフォルダ直下のフォルダ名
     """
+    if is_remote_path(target_dir):
+        key, remote_path = _parse_ssh_url(target_dir)
+        with _sftp_session(key) as sftp:
+            return _listdir_remote(sftp, remote_path)[0]
     return [
         dir_name
         for dir_name in os.listdir(target_dir)
@@ -142,6 +506,10 @@ def get_all_file_names_in(target_dir: str) -> list:
     Returns:
         対象のフォルダ直下のファイル名
     """
+    if is_remote_path(target_dir):
+        key, remote_path = _parse_ssh_url(target_dir)
+        with _sftp_session(key) as sftp:
+            return _listdir_remote(sftp, remote_path)[1]
     return [
         file_name
         for file_name in os.listdir(target_dir)
@@ -149,6 +517,243 @@ def get_all_file_names_in(target_dir: str) -> list:
     ]
 
 
+def _scan_dir_usage(
+    path: str,
+    top_n: int,
+    dir_filter: Optional[Callable[[str], bool]],
+    file_filter: Optional[Callable[[str], bool]],
+    prev_node: Optional[dict],
+    trust_dir_mtime: bool,
+) -> Tuple[dict, List[str]]:
+    """ディレクトリ直下のファイルを集計し、ノードと走査すべきサブディレクトリを返します。
+
+    前回のノードと更新時刻が一致する場合は、直下のエントリに変化がないとみなして
+    前回のファイル一覧を再利用し、scandir を省略します。
+    ただし前回の走査開始時刻に近い更新時刻は、同じ時刻の刻みの間に追加された
+    エントリを取りこぼしている可能性があるため再利用しません (git の racily clean と同様)。
+    trust_dir_mtime が True の場合はファイルの stat も省略し、前回の集計値を再利用します。
+    走査中に消えたエントリは無視し、読み込めないエントリは own_errors に記録します。
+
+    Raises:
+        OSError: ディレクトリ自体の stat や scandir に失敗した場合
+    """
+    scanned_ns = time.time_ns()
+    mtime_ns = os.stat(path).st_mtime_ns
+    node = {"path": path, "mtime_ns": mtime_ns, "scanned_ns": scanned_ns}
+    reusable = (
+        prev_node is not None
+        and prev_node["mtime_ns"] == mtime_ns
+        and mtime_ns < prev_node.get("scanned_ns", 0) - _USAGE_MTIME_MARGIN_NS
+    )
+    if reusable and trust_dir_mtime:
+        node.update(
+            own_bytes=prev_node["own_bytes"],
+            own_files=prev_node["own_files"],
+            own_largest=prev_node["own_largest"][:top_n],
+            # 読み込めなかったサブディレクトリは今回の走査結果で付け直す
+            own_errors=[
+                error
+                for error in prev_node["own_errors"]
+                if error not in prev_node["subdirs"]
+            ],
+            file_names=prev_node["file_names"],
+        )
+        return node, list(prev_node["subdirs"])
+
+    own_bytes = own_files = 0
+    largest: List[Tuple[int, str]] = []
+    own_errors = []
+    file_names = []
+
+    def add_file(file_path: str, size: int) -> None:
+        nonlocal own_bytes, own_files
+        own_bytes += size
+        own_files += 1
+        file_names.append(posixpath.basename(file_path))
+        if len(largest) < top_n:
+            heapq.heappush(largest, (size, file_path))
+        elif top_n > 0 and size > largest[0][0]:
+            heapq.heapreplace(largest, (size, file_path))
+
+    if reusable:
+        subdirs = list(prev_node["subdirs"])
+        for file_name in prev_node["file_names"]:
+            file_path = posixpath.join(path, file_name)
+            try:
+                add_file(file_path, os.stat(file_path, follow_symlinks=False).st_size)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                own_errors.append(file_path)
+    else:
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                entry_path = entry.path.replace("\\", "/")
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if dir_filter is None or dir_filter(entry_path):
+                            subdirs.append(entry_path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if file_filter is None or file_filter(entry_path):
+                            size = entry.stat(follow_symlinks=False).st_size
+                            add_file(entry_path, size)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    own_errors.append(entry_path)
+    node.update(
+        own_bytes=own_bytes,
+        own_files=own_files,
+        own_largest=sorted(largest, reverse=True),
+        own_errors=own_errors,
+        file_names=file_names,
+    )
+    return node, subdirs
+
+
+def get_dir_usage(
+    target_dir: str,
+    top_n: int = 10,
+    dir_filter: Optional[Callable[[str], bool]] = None,
+    file_filter: Optional[Callable[[str], bool]] = None,
+    prev: Optional[dict] = None,
+    trust_dir_mtime: bool = False,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """du のようにディレクトリ以下の使用量を集計し、ディレクトリごとの木構造で返します。
+
+    各ディレクトリは os.scandir で一度だけ走査し、ファイルごとの stat も一度だけ行います。
+    ディレクトリはスレッドプールで並列に走査し、走査が終わり次第サブディレクトリを投入します。
+    シンボリックリンクはたどらず、集計にも含めません。
+
+    各ノードは次のキーを持つ辞書です。
+        path: ディレクトリのパス
+        bytes / files: 配下全体の合計バイト数 / ファイル数
+        largest: 配下全体で大きい順の (サイズ, パス) のリスト (最大 top_n 件)
+        errors: 配下全体で読み込めなかったファイル・ディレクトリのパス
+        own_bytes / own_files / own_largest / own_errors: 直下のエントリのみの集計
+        children: サブディレクトリ名をキーとする子ノードの辞書
+        mtime_ns / scanned_ns / subdirs / file_names: 差分更新のための情報
+
+    prev に前回の結果を渡すと、更新時刻が変わっていないディレクトリは scandir を省略し、
+    前回のファイル一覧に対して stat だけを行います。追記で大きくなったファイルも検出できます。
+    前回の走査開始の直前 (2秒以内) に更新されたディレクトリは、取りこぼしを避けるため走査し直します。
+    trust_dir_mtime を True にすると stat も省略して前回の集計をそのまま使うため高速ですが、
+    既存ファイルへの追記や上書きのようにディレクトリの更新時刻が変わらない変更は検出できません。
+    prev には同じフィルタで得た結果を渡してください。
+    trust_dir_mtime が True の場合、prev より大きい top_n を指定しても再利用した
+    ディレクトリの largest は prev の top_n 件までしか含まれません。
+    結果は save_object_to_file でそのまま保存できます。
+
+    Args:
+        target_dir (str): 対象とするディレクトリ
+        top_n (int, optional): 記録する大きいファイルの件数
+        dir_filter (Callable[[str], bool], optional): False を返したディレクトリは走査しません
+        file_filter (Callable[[str], bool], optional): False を返したファイルは集計しません
+        prev (dict, optional): 同じフィルタで得た前回の get_dir_usage の結果
+        trust_dir_mtime (bool, optional): 更新時刻が同じディレクトリの集計を stat せずに再利用するかどうか
+        max_workers (int, optional): 走査に使うスレッド数
+
+    Returns:
+        dict: target_dir のノード
+
+    Raises:
+        FileNotFoundError: 指定したディレクトリが存在しない場合
+        OSError: 指定したディレクトリ自体を読み込めない場合
+    """
+    if not os.path.isdir(target_dir):
+        raise FileNotFoundError(f"No such directory: {target_dir}")
+    root = target_dir.replace("\\", "/")
+    # "/" や "C:/" のようなルートは末尾の区切りを残す (os.scandir("C:") はカレントを指すため)
+    if os.path.splitdrive(root)[1].strip("/"):
+        root = root.rstrip("/")
+
+    prev_nodes = {}
+    stack = [prev] if prev is not None else []
+    while stack:
+        node = stack.pop()
+        prev_nodes[node["path"]] = node
+        stack.extend(node["children"].values())
+
+    def scan(path: str) -> Union[Tuple[dict, List[str]], OSError, None]:
+        try:
+            return _scan_dir_usage(
+                path,
+                top_n,
+                dir_filter,
+                file_filter,
+                prev_nodes.get(path),
+                trust_dir_mtime,
+            )
+        except FileNotFoundError:
+            # 走査中に削除されたディレクトリ
+            return None
+        except OSError as e:
+            return e
+
+    nodes: Dict[str, dict] = {}
+    subdirs: Dict[str, List[str]] = {}
+    unreadable = set()
+    order = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 走査が終わったディレクトリから順にサブディレクトリを投入し、
+        # 大きなディレクトリや深い木でもワーカーを遊ばせない
+        pending = {executor.submit(scan, root): root}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                path = pending.pop(future)
+                result = future.result()
+                if isinstance(result, OSError):
+                    if path == root:
+                        raise result
+                    unreadable.add(path)
+                    continue
+                if result is None:
+                    continue
+                node, node_subdirs = result
+                nodes[path] = node
+                subdirs[path] = node_subdirs
+                # 子は親の走査後に投入されるため、order では必ず親より後ろに並ぶ
+                order.append(path)
+                for subdir in node_subdirs:
+                    pending[executor.submit(scan, subdir)] = subdir
+
+    if root not in nodes:
+        raise FileNotFoundError(f"No such directory: {target_dir}")
+
+    # 深い階層から順に子の集計を親へ積み上げる
+    for path in reversed(order):
+        node = nodes[path]
+        node["subdirs"] = subdirs[path]
+        node["own_errors"] = node["own_errors"] + [
+            child for child in subdirs[path] if child in unreadable
+        ]
+        children = {
+            posixpath.basename(child): nodes[child]
+            for child in subdirs[path]
+            if child in nodes
+        }
+        node["children"] = children
+        node["bytes"] = node["own_bytes"] + sum(c["bytes"] for c in children.values())
+        node["files"] = node["own_files"] + sum(c["files"] for c in children.values())
+        node["largest"] = heapq.nlargest(
+            top_n,
+            itertools.chain(
+                node["own_largest"], *(c["largest"] for c in children.values())
+            ),
+        )
+        node["errors"] = list(
+            itertools.chain(
+                node["own_errors"], *(c["errors"] for c in children.values())
+            )
+        )
+    return nodes[root]
+
+
 def get_file_extension(path: str) -> str:
     """ファイルの拡張子の文字列を取得します。
 
@@ -243,6 +848,14 @@ def is_exists(path: str) -> bool:
     Returns:
         bool: 指定されたパスが存在する場合には True、存在しない場合には False
     """
+    if is_remote_path(path):
+        key, remote_path = _parse_ssh_url(path)
+        with _sftp_session(key) as sftp:
+            try:
+                sftp.stat(remote_path)
+                return True
+            except FileNotFoundError:
+                return False
     return os.path.exists(path)
 
 
@@ -331,20 +944,35 @@ def rmrf(path: str) -> None:
 def copy_file(load_path: str, save_path: str) -> None:
     """ファイルをコピーします。
 
+    どちらかに ssh://[user@]host[:port]/path 形式のパスを指定すると、
+    プールしたSFTP接続を使ってリモートとの間でコピーします。
+
     Args:
         load_path (str): コピー元のパス
         save_path (str): コピー先のパス
     """
+    if is_remote_path(load_path) or is_remote_path(save_path):
+        _copy_remote_file(load_path, save_path)
+        return
     shutil.copy(load_path, save_path)
 
 
-def copy_dir(load_path: str, save_path: str) -> None:
+def copy_dir(
+    load_path: str, save_path: str, max_workers: int = _SSH_MAX_CHANNELS
+) -> None:
     """ディレクトリを再帰的にコピーします。
 
+    どちらかに ssh://[user@]host[:port]/path 形式のパスを指定すると、
+    複数のSFTPチャネルでファイルを並列に転送します。
+
     Args:
         load_path (str): コピー元のパス
         save_path (str): コピー先のパス
+        max_workers (int, optional): リモートとのコピー時に並列で使うSFTPチャネル数
     """
+    if is_remote_path(load_path) or is_remote_path(save_path):
+        _copy_remote_dir(load_path, save_path, max_workers)
+        return
     shutil.copytree(load_path, save_path)
 
 
@@ -0,0 +1,323 @@
+import os
+import socket
+import threading
+
+import paramiko
+import pytest
+
+from lib763 import fs
+
+
+class _StubSFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class _StubSFTPServer(paramiko.SFTPServerInterface):
+    """ローカルディレクトリをリモートのルートとして公開するSFTPサーバ"""
+
+    root = ""
+
+    def _local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def canonicalize(self, path):
+        if not path.startswith("/"):
+            path = "/home/" + path
+        return os.path.normpath(path).replace("\\", "/")
+
+    def list_folder(self, path):
+        # OpenSSH の sftp-server と同様に一覧の属性は lstat で返す
+        try:
+            local = self._local(path)
+            attrs = []
+            for name in os.listdir(local):
+                attr = paramiko.SFTPAttributes.from_stat(
+                    os.lstat(os.path.join(local, name))
+                )
+                attr.filename = name
+                attrs.append(attr)
+            return attrs
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._local(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def lstat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(self._local(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._local(path))
+            return paramiko.SFTP_OK
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def open(self, path, flags, attr):
+        try:
+            fd = os.open(self._local(path), flags, 0o644)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        f = os.fdopen(fd, mode)
+        handle = _StubSFTPHandle(flags)
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+
+
+class _StubSSHServer(paramiko.ServerInterface):
+    def check_auth_password(self, username, password):
+        if password == "secret":
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """インプロセスのSSHサーバを起動し、(ssh:// のベースURL, リモートのルート) を返す"""
+    root = tmp_path / "remote"
+    (root / "home").mkdir(parents=True)
+    _StubSFTPServer.root = str(root)
+    host_key = paramiko.RSAKey.generate(2048)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    port = sock.getsockname()[1]
+
+    def serve():
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(host_key)
+            transport.set_subsystem_handler(
+                "sftp", paramiko.SFTPServer, _StubSFTPServer
+            )
+            transport.start_server(server=_StubSSHServer())
+
+    threading.Thread(target=serve, daemon=True).start()
+    fs.set_ssh_options(
+        "127.0.0.1",
+        port,
+        auto_add_host_key=True,
+        password="secret",
+        look_for_keys=False,
+        allow_agent=False,
+    )
+    yield f"ssh://user@127.0.0.1:{port}", root
+    fs.close_ssh_connections()
+    sock.close()
+
+
+def test_str_round_trip(remote):
+    base, root = remote
+    fs.save_str_to_file("a  \nb", base + "/x.txt")
+    assert (root / "x.txt").read_text() == "a  \nb"
+    assert fs.load_str_from_file(base + "/x.txt") == "a\nb"
+    fs.append_str_to_file("\nc", base + "/x.txt")
+    assert fs.load_str_from_file(base + "/x.txt") == "a\nb\nc"
+
+
+def test_load_str_splits_lines_like_local(remote, tmp_path):
+    base, root = remote
+    content = b"a\x0cb\x1cc\xe2\x80\xa8d  \r\ne\rf\n"
+    (root / "x.txt").write_bytes(content)
+    (tmp_path / "x.txt").write_bytes(content)
+    expected = fs.load_str_from_file(str(tmp_path / "x.txt"))
+    assert fs.load_str_from_file(base + "/x.txt") == expected
+    assert expected == "a\x0cb\x1cc\u2028d\ne\nf"
+
+
+def test_append_str_to_missing_file(remote):
+    base, root = remote
+    with pytest.raises(FileNotFoundError):
+        fs.append_str_to_file("a", base + "/missing.txt")
+    assert not (root / "missing.txt").exists()
+
+
+def test_load_str_from_missing_file(remote):
+    base, _ = remote
+    with pytest.raises(FileNotFoundError):
+        fs.load_str_from_file(base + "/missing.txt")
+
+
+def test_object_round_trip(remote):
+    base, _ = remote
+    fs.save_object_to_file({"k": [1, 2]}, base + "/o.pkl")
+    assert fs.load_object_from_file(base + "/o.pkl") == {"k": [1, 2]}
+
+
+def test_is_exists(remote):
+    base, root = remote
+    (root / "x.txt").write_text("x")
+    assert fs.is_exists(base + "/x.txt")
+    assert not fs.is_exists(base + "/y.txt")
+
+
+def test_home_relative_path(remote):
+    base, root = remote
+    fs.save_str_to_file("h", base + "/~/h.txt")
+    assert (root / "home" / "h.txt").read_text() == "h"
+
+
+def test_get_all_file_path_in_skips_hidden(remote):
+    base, root = remote
+    (root / "d" / "sub").mkdir(parents=True)
+    (root / "d" / ".hidden_dir").mkdir()
+    (root / "d" / "a.txt").write_text("a")
+    (root / "d" / ".hidden").write_text("h")
+    (root / "d" / "sub" / "b.txt").write_text("b")
+    (root / "d" / ".hidden_dir" / "c.txt").write_text("c")
+    assert sorted(fs.get_all_file_path_in(base + "/d")) == [
+        base + "/d/a.txt",
+        base + "/d/sub/b.txt",
+    ]
+    assert fs.get_all_dir_path_in(base + "/d") == [base + "/d/sub/"]
+    assert sorted(fs.get_all_dir_names_in(base + "/d")) == [".hidden_dir", "sub"]
+    assert sorted(fs.get_all_file_names_in(base + "/d")) == [".hidden", "a.txt"]
+
+
+def test_copy_file_both_directions(remote, tmp_path):
+    base, root = remote
+    local = tmp_path / "local"
+    local.mkdir()
+    (local / "a.txt").write_text("a")
+
+    fs.copy_file(str(local / "a.txt"), base + "/a.txt")
+    assert (root / "a.txt").read_text() == "a"
+    (root / "d").mkdir()
+    fs.copy_file(str(local / "a.txt"), base + "/d")
+    assert (root / "d" / "a.txt").read_text() == "a"
+
+    fs.copy_file(base + "/a.txt", str(local / "b.txt"))
+    assert (local / "b.txt").read_text() == "a"
+    fs.copy_file(base + "/d/a.txt", base + "/c.txt")
+    assert (root / "c.txt").read_text() == "a"
+
+
+def test_copy_dir_both_directions(remote, tmp_path):
+    base, root = remote
+    src = tmp_path / "src"
+    (src / "sub" / "deeper").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "sub" / "b.txt").write_text("b")
+    (src / "sub" / "deeper" / "c.txt").write_text("c")
+
+    fs.copy_dir(str(src), base + "/copy", max_workers=2)
+    assert (root / "copy" / "sub" / "deeper" / "c.txt").read_text() == "c"
+    with pytest.raises(FileExistsError):
+        fs.copy_dir(str(src), base + "/copy")
+
+    back = tmp_path / "back"
+    fs.copy_dir(base + "/copy", str(back))
+    assert sorted(fs.get_all_file_path_in(str(back))) == [
+        str(back / "a.txt").replace("\\", "/"),
+        str(back / "sub" / "b.txt").replace("\\", "/"),
+        str(back / "sub" / "deeper" / "c.txt").replace("\\", "/"),
+    ]
+    assert (back / "sub" / "b.txt").read_text() == "b"
+
+
+def _make_symlinks(target):
+    try:
+        os.symlink(target / "real_dir", target / "link_dir")
+        os.symlink(target / "real_dir" / "a.txt", target / "link_file")
+        os.symlink(target / "missing", target / "broken")
+    except OSError:
+        pytest.skip("symlink unsupported")
+
+
+@pytest.fixture
+def remote_links(remote):
+    base, root = remote
+    (root / "d" / "real_dir").mkdir(parents=True)
+    (root / "d" / "real_dir" / "a.txt").write_text("a")
+    _make_symlinks(root / "d")
+    return base, root
+
+
+def test_remote_symlinks_are_followed(remote_links):
+    base, _ = remote_links
+    assert sorted(fs.get_all_dir_names_in(base + "/d")) == ["link_dir", "real_dir"]
+    assert fs.get_all_file_names_in(base + "/d") == ["link_file"]
+    assert sorted(fs.get_all_file_path_in(base + "/d")) == [
+        base + "/d/link_dir/a.txt",
+        base + "/d/link_file",
+        base + "/d/real_dir/a.txt",
+    ]
+
+
+def test_copy_dir_from_remote_follows_symlinks(remote_links, tmp_path):
+    base, _ = remote_links
+    dst = tmp_path / "dst"
+    fs.copy_dir(base + "/d", str(dst))
+    assert (dst / "link_dir" / "a.txt").read_text() == "a"
+    assert (dst / "link_file").read_text() == "a"
+    assert not (dst / "broken").exists()
+
+
+def test_copy_dir_to_remote_follows_symlinks(remote, tmp_path):
+    base, root = remote
+    src = tmp_path / "src"
+    (src / "real_dir").mkdir(parents=True)
+    (src / "real_dir" / "a.txt").write_text("a")
+    try:
+        os.symlink(src / "real_dir", src / "link_dir")
+        os.symlink(src / "real_dir" / "a.txt", src / "link_file")
+    except OSError:
+        pytest.skip("symlink unsupported")
+
+    fs.copy_dir(str(src), base + "/copy")
+    assert (root / "copy" / "link_dir" / "a.txt").read_text() == "a"
+    assert (root / "copy" / "link_file").read_text() == "a"
+    assert not (root / "copy" / "link_dir").is_symlink()
+
+
+@pytest.mark.parametrize("name", ["c#1.txt", "what?.txt", "sp ace%20.txt"])
+def test_special_characters_in_names(remote, tmp_path, name):
+    base, root = remote
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / name).write_text("x")
+
+    fs.copy_dir(str(src), base + "/copy")
+    assert os.listdir(root / "copy") == [name]
+    paths = fs.get_all_file_path_in(base + "/copy")
+    assert paths == [base + "/copy/" + name]
+    assert fs.load_str_from_file(paths[0]) == "x"
+
+
+def test_ipv6_host_round_trip():
+    key, remote_path = fs._parse_ssh_url("ssh://user@[::1]:2222/tmp/a#b?.txt")
+    assert key == ("user", "::1", 2222)
+    assert remote_path == "/tmp/a#b?.txt"
+    assert fs._build_ssh_url(key, remote_path) == "ssh://user@[::1]:2222/tmp/a#b?.txt"
+
+
+def test_connections_are_pooled(remote):
+    base, root = remote
+    for i in range(5):
+        fs.save_str_to_file(str(i), f"{base}/{i}.txt")
+    assert len(fs._ssh_clients) == 1
+    assert sum(len(sessions) for sessions in fs._sftp_pool.values()) == 1
@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+
+import pytest
+
+from lib763 import fs
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+def _p(path):
+    return str(path).replace("\\", "/")
+
+
+def _age(root, seconds=3600):
+    """差分更新で再利用されるよう、ディレクトリの更新時刻を過去にずらす"""
+    past = time.time_ns() - seconds * 10**9
+    for dir_path, _, _ in os.walk(root):
+        os.utime(dir_path, ns=(past, past))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    root/top (7)
+    root/a/f1 (100), root/a/f2 (50)
+    root/a/b/g (30)
+    root/c/skip/big (1000)
+    """
+    root = tmp_path / "root"
+    _write(root / "top", 7)
+    _write(root / "a" / "f1", 100)
+    _write(root / "a" / "f2", 50)
+    _write(root / "a" / "b" / "g", 30)
+    _write(root / "c" / "skip" / "big", 1000)
+    return root
+
+
+def test_totals(tree):
+    usage = fs.get_dir_usage(str(tree), top_n=3)
+    assert usage["path"] == _p(tree)
+    assert usage["bytes"] == 1187
+    assert usage["files"] == 5
+    assert usage["own_bytes"] == 7
+    assert usage["own_files"] == 1
+    assert usage["largest"] == [
+        (1000, _p(tree / "c" / "skip" / "big")),
+        (100, _p(tree / "a" / "f1")),
+        (50, _p(tree / "a" / "f2")),
+    ]
+    assert usage["errors"] == []
+    a = usage["children"]["a"]
+    assert (a["bytes"], a["files"]) == (180, 3)
+    assert a["children"]["b"]["largest"] == [(30, _p(tree / "a" / "b" / "g"))]
+    assert sorted(usage["children"]) == ["a", "c"]
+
+
+def test_trailing_separator_is_ignored(tree):
+    usage = fs.get_dir_usage(str(tree) + "/")
+    assert usage["path"] == _p(tree)
+    assert usage["bytes"] == 1187
+
+
+def test_dir_filter_prunes(tree):
+    visited = []
+
+    def dir_filter(path):
+        visited.append(path)
+        return not path.endswith("/skip")
+
+    usage = fs.get_dir_usage(str(tree), dir_filter=dir_filter)
+    assert usage["bytes"] == 187
+    assert usage["files"] == 4
+    assert usage["children"]["c"]["children"] == {}
+    assert _p(tree / "c" / "skip") in visited
+
+
+def test_file_filter_excludes(tree):
+    usage = fs.get_dir_usage(str(tree), file_filter=lambda p: not p.endswith("f1"))
+    assert usage["bytes"] == 1087
+    assert usage["files"] == 4
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlink unsupported")
+def test_symlinks_are_not_followed(tree):
+    try:
+        os.symlink(tree / "c", tree / "link_dir")
+        os.symlink(tree / "a" / "f1", tree / "link_file")
+    except OSError:
+        pytest.skip("symlink unsupported")
+    usage = fs.get_dir_usage(str(tree))
+    assert usage["bytes"] == 1187
+    assert usage["files"] == 5
+    assert "link_dir" not in usage["children"]
+
+
+def test_prev_reuses_unchanged_dirs(tree, monkeypatch):
+    _age(tree)
+    prev = fs.get_dir_usage(str(tree))
+    _write(tree / "a" / "b" / "new", 40)
+
+    scanned = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        scanned.append(_p(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    usage = fs.get_dir_usage(str(tree), prev=prev)
+    assert scanned == [_p(tree / "a" / "b")]
+    assert usage["bytes"] == 1227
+    assert usage["files"] == 6
+
+
+def test_prev_detects_grown_files(tree):
+    _age(tree)
+    prev = fs.get_dir_usage(str(tree))
+    stat = os.stat(tree / "a")
+    with open(tree / "a" / "f2", "ab") as f:
+        f.write(b"x" * 1000)
+    os.utime(tree / "a", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    usage = fs.get_dir_usage(str(tree), prev=prev)
+    assert usage["bytes"] == 2187
+    assert usage["largest"][0] == (1050, _p(tree / "a" / "f2"))
+
+    trusted = fs.get_dir_usage(str(tree), prev=prev, trust_dir_mtime=True)
+    assert trusted["bytes"] == 1187
+
+
+def test_trusted_prev_trims_largest_to_top_n(tree):
+    _age(tree)
+    prev = fs.get_dir_usage(str(tree), top_n=10)
+    usage = fs.get_dir_usage(str(tree), top_n=1, prev=prev, trust_dir_mtime=True)
+    assert usage["children"]["a"]["own_largest"] == [(100, _p(tree / "a" / "f1"))]
+    assert len(usage["largest"]) == 1
+
+
+def test_prev_does_not_reuse_racy_dirs(tree):
+    # 走査と同じ時刻の刻みで追加されたエントリを、更新時刻を据え置いて再現する
+    prev = fs.get_dir_usage(str(tree))
+    stat = os.stat(tree / "a")
+    _write(tree / "a" / "racy", 500)
+    (tree / "a" / "racy_dir").mkdir()
+    _write(tree / "a" / "racy_dir" / "g", 5)
+    os.utime(tree / "a", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    for trust_dir_mtime in (False, True):
+        usage = fs.get_dir_usage(
+            str(tree), prev=prev, trust_dir_mtime=trust_dir_mtime
+        )
+        assert usage["bytes"] == 1692
+        assert "racy_dir" in usage["children"]["a"]["children"]
+
+
+def test_slow_dir_does_not_block_other_subtrees(tree, monkeypatch):
+    slow = _p(tree / "c")
+    deep = _p(tree / "a" / "b")
+    deep_scanned = threading.Event()
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if _p(path) == slow:
+            assert deep_scanned.wait(5), "deeper dirs waited for a slow sibling"
+        elif _p(path) == deep:
+            deep_scanned.set()
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    usage = fs.get_dir_usage(str(tree), max_workers=4)
+    assert usage["bytes"] == 1187
+
+
+def test_vanished_file_is_skipped(tree, monkeypatch):
+    vanished = _p(tree / "a" / "f1")
+    real_stat = os.DirEntry.stat
+
+    class Entry:
+        def __init__(self, entry):
+            self._entry = entry
+            self.path = entry.path
+
+        def is_dir(self, follow_symlinks=True):
+            return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+        def is_file(self, follow_symlinks=True):
+            return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+        def stat(self, follow_symlinks=True):
+            if _p(self.path) == vanished:
+                raise FileNotFoundError(self.path)
+            return real_stat(self._entry, follow_symlinks=follow_symlinks)
+
+    real_scandir = os.scandir
+
+    class Scandir:
+        def __init__(self, path):
+            self._it = real_scandir(path)
+
+        def __enter__(self):
+            return (Entry(entry) for entry in self._it)
+
+        def __exit__(self, *args):
+            self._it.close()
+
+    monkeypatch.setattr(os, "scandir", Scandir)
+    usage = fs.get_dir_usage(str(tree))
+    a = usage["children"]["a"]
+    assert (a["bytes"], a["files"]) == (80, 2)
+    assert a["children"]["b"]["bytes"] == 30
+    assert usage["errors"] == []
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() == 0,
+    reason="permissions are not enforced",
+)
+def test_unreadable_dirs_are_recorded(tree):
+    locked = tree / "a" / "b"
+    locked.chmod(0)
+    try:
+        usage = fs.get_dir_usage(str(tree))
+    finally:
+        locked.chmod(0o755)
+    assert usage["errors"] == [_p(locked)]
+    assert usage["children"]["a"]["own_errors"] == [_p(locked)]
+    assert usage["bytes"] == 1157
+
+
+def test_unreadable_dirs_are_recorded_with_mock(tree, monkeypatch):
+    _age(tree)
+    locked = _p(tree / "a" / "b")
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if _p(path) == locked:
+            raise PermissionError(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    usage = fs.get_dir_usage(str(tree))
+    assert usage["errors"] == [locked]
+    assert "b" not in usage["children"]["a"]["children"]
+
+    prev = usage
+    usage = fs.get_dir_usage(str(tree), prev=prev, trust_dir_mtime=True)
+    assert usage["errors"] == [locked]
+
+    monkeypatch.setattr(os, "scandir", real_scandir)
+    usage = fs.get_dir_usage(str(tree), prev=prev, trust_dir_mtime=True)
+    assert usage["errors"] == []
+    assert usage["bytes"] == 1187
+
+
+def test_missing_dir(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        fs.get_dir_usage(str(tmp_path / "missing"))